@@ -1,20 +1,29 @@
 import os
-import json
-import requests
-import io
+import re
+import sys
+import orjson
+import time
+import atexit
+import asyncio
+import httpx
+import traceback
+from functools import partial
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, TypedDict, Annotated, Sequence, Union, Literal
-from pydantic import BaseModel, Field
-from pydub import AudioSegment
+from pydantic import BaseModel, Field, ValidationError, ValidationInfo, model_validator
 from dotenv import load_dotenv
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langgraph.graph import Graph, StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.constants import Send
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.output_parsers import PydanticOutputParser
 from agents.utils.rag_application import RAGApplication
-from datetime import datetime
 from agents.utils.podcast_s3_storage import S3Storage
-from agents.utils.upstash_cache import PodcastCache
+from agents.utils.podcast_audio import render_silence, stream_segments_to_upload
+from agents.utils.upstash_cache import PodcastCache, RAGCache
 from agents.utils.flashcard_agent import ContentEngine, FlashcardSet, Flashcard
 from agents.utils.qna_agent import QuizGenerator, QuizSet
 from agents.utils.tweet_agent import TweetAgent, TweetContent
@@ -22,16 +31,26 @@ from agents.utils.blog_agent import BlogAgent, BlogContent
 
 load_dotenv()
 
+ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1"
+# Upper bound on in-flight ElevenLabs requests to stay under the API rate limits
+ELEVENLABS_MAX_CONCURRENCY = 8
+# Segments are stream-copied into one file, so TTS and silence must share one MP3 format
+ELEVENLABS_OUTPUT_FORMAT = "mp3_44100_128"
+# One script line: an optional "Speaker N:" label followed by the dialogue
+_SPEAKER_RE = re.compile(r'^[ \t]*(?:(Speaker [12]):)?[ \t]*(.*?)[ \t\r]*$', re.MULTILINE)
+
 class RAGContext(BaseModel):   
     question: str
     pdf_title: str
     answer: Optional[str] = None
     evidence: List[str] = []
 
-class PodcastSegment(BaseModel):
+@dataclass(slots=True)
+class PodcastSegment:
     speaker: str
     text: str
     expression: Optional[str] = None
+    voice_id: Optional[str] = None
 
 class CacheResult(BaseModel):
     found: bool
@@ -40,20 +59,55 @@ class CacheResult(BaseModel):
 class PodcastScript(BaseModel):
     segments: List[PodcastSegment] = Field(description="List of podcast segments")
 
-class EnhancedGraphState(BaseModel):
-    messages: List[BaseMessage]
+    @model_validator(mode="after")
+    def assign_voices(self, info: ValidationInfo) -> "PodcastScript":
+        """Resolve each segment's voice from the speaker-to-voice map passed as validation context"""
+        voices = (info.context or {}).get("voices")
+        if voices:
+            for segment in self.segments:
+                segment.voice_id = voices.get(segment.speaker)
+        return self
+
+def last_write_wins(current: Any, new: Any) -> Any:
+    """Reducer for fields written by parallel branches; a None write keeps the current value"""
+    return current if new is None else new
+
+def append_transcript(current: str, new: str) -> str:
+    """Reducer that extends the running conversation transcript with new message text"""
+    return f"{current}\n{new}" if current else new
+
+def looks_like_json(text: str) -> bool:
+    """Cheap check so plain-text scripts skip the JSON parse attempt entirely"""
+    return text.lstrip().startswith(("{", "["))
+
+class EnhancedGraphState(TypedDict, total=False):
+    """Graph state; nodes return only the keys they update and reducers merge them"""
+    messages: Annotated[List[BaseMessage], add_messages]
+    transcript: Annotated[str, append_transcript]
     topic: str
-    output_type: str
-    rag_context: Optional[RAGContext] = None
-    pdf_title: Optional[str] = None
-    cache_result: Optional[CacheResult] = None  
-    s3_url: Optional[str] = None
-    flashcards: Optional[FlashcardSet] = None
-    quiz: Optional[QuizSet] = None  # Add this line
-    current_stage: str = "start"
-    script: Optional[str] = None
-    blog_content: Optional[BlogContent] = None
-    tweet_content: Optional[TweetContent] = None
+    output_types: List[str]
+    rag_context: Optional[RAGContext]
+    pdf_title: Optional[str]
+    cache_result: Optional[CacheResult]
+    s3_url: Annotated[Optional[str], last_write_wins]
+    flashcards: Annotated[Optional[FlashcardSet], last_write_wins]
+    quiz: Annotated[Optional[QuizSet], last_write_wins]
+    current_stage: Annotated[str, last_write_wins]
+    script: Optional[str]
+    blog_content: Annotated[Optional[BlogContent], last_write_wins]
+    tweet_content: Annotated[Optional[TweetContent], last_write_wins]
+
+# Entry node of each generation path, keyed by output type
+CONTENT_NODES = {
+    "podcast": "check_cache",
+    "flashcards": "generate_flashcards",
+    "quiz": "generate_quiz",
+    "blog": "blog_generation",
+    "tweet": "tweet_generation"
+}
+
+# Output types whose generate_content results include conversation_history and source_pdf
+HISTORY_OUTPUT_TYPES = {"podcast", "quiz", "flashcards"}
 
 class IntegratedContentGenerator:
     def __init__(self):
@@ -62,8 +116,6 @@ class IntegratedContentGenerator:
         self.podcast_cache = PodcastCache()
         self.s3_storage = S3Storage(bucket_name=os.getenv("AWS_BUCKET_NAME"))
 
-def route_by_output_type(state: EnhancedGraphState) -> str:
-    return state.output_type
 TOPIC_EXPANSION_PROMPT = """
 You are an expert podcast planner. 
 Using the provided research context and the current conversation, create a structured, in-depth outline for a 3-5 minute podcast discussion between two speakers. 
@@ -73,7 +125,8 @@ Also ensure the outline highlights the most impactful insights and potential imp
 Topic: {topic}
 
 Research Context:
-{rag_context}
+Answer: {answer}
+Evidence: provided as the messages that follow.
 
 Current conversation: {messages}
 
@@ -94,7 +147,8 @@ You are a professional podcast script writer. Create a natural 3-5 minute conver
 - Speaker 2: the expert who explains the research findings
 
 Research Context:
-{rag_context}
+Answer: {answer}
+Evidence: provided as the messages that follow.
 
 Outline:
 {outline}
@@ -132,6 +186,17 @@ Current script:
 Return only the enhanced script in the same format, applying all improvements.
 """
 
+# Parse the prompt templates once instead of on every node invocation
+# Evidence chunks are passed as individual messages rather than joined into the prompt text
+_TOPIC_PROMPT = ChatPromptTemplate.from_messages([
+    ("human", TOPIC_EXPANSION_PROMPT),
+    MessagesPlaceholder("evidence_msgs")
+])
+_SCRIPT_PROMPT = ChatPromptTemplate.from_messages([
+    ("human", SCRIPT_GENERATION_PROMPT),
+    MessagesPlaceholder("evidence_msgs")
+])
+
 class PodcastGenerator:
     def __init__(self):
         self.llm = ChatOpenAI(
@@ -146,8 +211,14 @@ class PodcastGenerator:
             "Speaker 1": os.getenv("ELEVENLABS_VOICE_ID_1"),
             "Speaker 2": os.getenv("ELEVENLABS_VOICE_ID_2")
         }
+        self.elevenlabs_headers = {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": self.elevenlabs_api_key
+        }
         self.s3_storage = S3Storage(bucket_name=os.getenv("AWS_BUCKET_NAME"))
         self.cache = PodcastCache()
+        self.rag_cache = RAGCache()
         self.content_engine = ContentEngine()
         self.quiz_generator = QuizGenerator(api_key=os.getenv("GEMINI_API_KEY"))
         
@@ -188,17 +259,11 @@ class PodcastGenerator:
         # Set up the base flow
         workflow.add_edge(START, "route_content")
         
-        # Add single conditional edges block for content type routing
+        # Fan out to every requested content type; branches run in the same super-step
         workflow.add_conditional_edges(
             "route_content",
-            lambda x: x.output_type,
-            {
-            "podcast": "check_cache",
-            "flashcards": "generate_flashcards",
-            "quiz": "generate_quiz",
-            "blog": "blog_generation",
-            "tweet": "tweet_generation" 
-            }
+            self.dispatch_content,
+            list(CONTENT_NODES.values())
         )
         
         # Podcast generation path
@@ -206,7 +271,7 @@ class PodcastGenerator:
             "check_cache",
             self.route_from_cache,
             {
-                "cached": "tts_generation",
+                "cached": END,
                 "not_cached": "rag_retrieval"
             }
         )
@@ -224,231 +289,233 @@ class PodcastGenerator:
         return workflow.compile()
     
 
-    def generate_blog(self, state: EnhancedGraphState) -> EnhancedGraphState:
+    async def generate_blog(self, state: EnhancedGraphState) -> Dict[str, Any]:
         """Generate a blog using the BlogAgent."""
         try:
             print("DEBUG: Starting blog generation")
-            print(f"DEBUG: RAG Context - Question: {state.rag_context.question}")
-            print(f"DEBUG: RAG Context - Answer: {state.rag_context.answer}")
-            print(f"DEBUG: RAG Context - Evidence Length: {len(state.rag_context.evidence)}")
+            print(f"DEBUG: RAG Context - Question: {state['rag_context'].question}")
+            print(f"DEBUG: RAG Context - Answer: {state['rag_context'].answer}")
+            print(f"DEBUG: RAG Context - Evidence Length: {len(state['rag_context'].evidence)}")
 
             blog_agent = BlogAgent(api_key=os.getenv("GEMINI_API_KEY"))
             
             # Detect lack of context and adjust generation strategy
-            if not state.rag_context.answer or not state.rag_context.evidence:
+            if not state["rag_context"].answer or not state["rag_context"].evidence:
                 # Generate a generic blog based on the query
-                blog_content = blog_agent.generate_blog(
-                    query=state.rag_context.question,
+                blog_content = await asyncio.to_thread(
+                    blog_agent.generate_blog,
+                    query=state["rag_context"].question,
                     rag_context={
-                        "answer": f"Exploring the topic: {state.rag_context.question}",
+                        "answer": f"Exploring the topic: {state['rag_context'].question}",
                         "evidence": []
                     }
                 )
             else:
                 # Normal blog generation with available context
-                blog_content = blog_agent.generate_blog(
-                    query=state.rag_context.question,
+                blog_content = await asyncio.to_thread(
+                    blog_agent.generate_blog,
+                    query=state["rag_context"].question,
                     rag_context={
-                        "answer": state.rag_context.answer,
-                        "evidence": state.rag_context.evidence
+                        "answer": state["rag_context"].answer,
+                        "evidence": state["rag_context"].evidence
                     }
                 )
 
             print(f"DEBUG: Generated Blog Content: {blog_content}")
             print(f"DEBUG: Blog Content Type: {type(blog_content)}")
 
-            # Directly set the blog_content in the state
-            state.blog_content = blog_content
-            
-            state.messages.append(
-                AIMessage(content=f"Generated blog: {blog_content.title}")
-            )
-            state.current_stage = "blog_generation"
-
             print("DEBUG: Blog generation completed successfully")
 
+            # Return only the fields this branch owns so parallel branches merge cleanly
+            return {
+                "blog_content": blog_content,
+                "messages": [AIMessage(content=f"Generated blog: {blog_content.title}")],
+                "transcript": f"Generated blog: {blog_content.title}",
+                "current_stage": "blog_generation"
+            }
+
         except Exception as e:
             print(f"CRITICAL ERROR generating blog: {str(e)}")
             print(f"ERROR Details: {traceback.format_exc()}")
-            state.blog_content = None
+            return {"blog_content": None}
 
-        return state
-
-    def generate_tweet(self, state: EnhancedGraphState) -> EnhancedGraphState:
+    async def generate_tweet(self, state: EnhancedGraphState) -> Dict[str, Any]:
         """Generate a tweet using the TweetAgent."""
         try:
             print("DEBUG: Starting tweet generation")
-            print(f"DEBUG: RAG Context - Question: {state.rag_context.question}")
-            print(f"DEBUG: RAG Context - Answer: {state.rag_context.answer}")
-            print(f"DEBUG: RAG Context - Evidence Length: {len(state.rag_context.evidence)}")
+            print(f"DEBUG: RAG Context - Question: {state['rag_context'].question}")
+            print(f"DEBUG: RAG Context - Answer: {state['rag_context'].answer}")
+            print(f"DEBUG: RAG Context - Evidence Length: {len(state['rag_context'].evidence)}")
 
             tweet_agent = TweetAgent(api_key=os.getenv("GEMINI_API_KEY"))
             
             rag_context = {
-                "answer": state.rag_context.answer,
-                "evidence": state.rag_context.evidence
+                "answer": state["rag_context"].answer,
+                "evidence": state["rag_context"].evidence
             }
             
-            tweet_content = tweet_agent.generate_tweet(
-                query=state.rag_context.question,
+            tweet_content = await asyncio.to_thread(
+                tweet_agent.generate_tweet,
+                query=state["rag_context"].question,
                 rag_context=rag_context
             )
 
             print(f"DEBUG: Generated Tweet Content: {tweet_content}")
             print(f"DEBUG: Tweet Content Type: {type(tweet_content)}")
 
-            # Directly set the tweet_content in the state
-            setattr(state, 'tweet_content', tweet_content)
-            
-            state.messages.append(
-                AIMessage(content=f"Generated tweet: {tweet_content.tweet}")
-            )
-            state.current_stage = "tweet_generation"
-
             print("DEBUG: Tweet generation completed successfully")
 
+            return {
+                "tweet_content": tweet_content,
+                "messages": [AIMessage(content=f"Generated tweet: {tweet_content.tweet}")],
+                "transcript": f"Generated tweet: {tweet_content.tweet}",
+                "current_stage": "tweet_generation"
+            }
+
         except Exception as e:
             print(f"CRITICAL ERROR generating tweet: {str(e)}")
             print(f"ERROR Details: {traceback.format_exc()}")
-            state.tweet_content = None
-
-        return state
+            return {"tweet_content": None}
 
-    def generate_quiz(self, state: EnhancedGraphState) -> EnhancedGraphState:
+    async def generate_quiz(self, state: EnhancedGraphState) -> Dict[str, Any]:
         """Generate quiz using quiz generator"""
         context = f"""
-        Question: {state.rag_context.question}
-        Answer: {state.rag_context.answer}
-        Evidence: {' '.join(state.rag_context.evidence)}
+        Question: {state['rag_context'].question}
+        Answer: {state['rag_context'].answer}
+        Evidence: {' '.join(state['rag_context'].evidence)}
         """
         
         try:
-            quiz_set = self.quiz_generator.generate_quiz(
+            quiz_set = await asyncio.to_thread(
+                self.quiz_generator.generate_quiz,
                 context=context,
-                question=state.topic,
+                question=state["topic"],
                 num_questions=5
             )
             
-            state.quiz = quiz_set
-            state.current_stage = "complete"
+            return {"quiz": quiz_set, "current_stage": "complete"}
             
         except Exception as e:
             print(f"Quiz generation error: {str(e)}")
-            state.quiz = None
-            
-        return state
+            return {"quiz": None}
     
-    def route_content(self, state: EnhancedGraphState) -> EnhancedGraphState:
+    def route_content(self, state: EnhancedGraphState) -> Dict[str, Any]:
         """Route to appropriate content generation based on output type"""
-        state.current_stage = "routing"
-        return state
+        return {"current_stage": "routing"}
+
+    def dispatch_content(self, state: EnhancedGraphState) -> List[Send]:
+        """Send the state to the entry node of every requested output type"""
+        return [Send(CONTENT_NODES[output_type], state) for output_type in state["output_types"]]
     
-    def generate_flashcards(self, state: EnhancedGraphState) -> EnhancedGraphState:
+    async def generate_flashcards(self, state: EnhancedGraphState) -> Dict[str, Any]:
         """Generate flashcards using content engine"""
         context = f"""
-        Question: {state.rag_context.question}
-        Answer: {state.rag_context.answer}
-        Evidence: {' '.join(state.rag_context.evidence)}
+        Question: {state['rag_context'].question}
+        Answer: {state['rag_context'].answer}
+        Evidence: {' '.join(state['rag_context'].evidence)}
         """
         
         try:
-            flashcard_set = self.content_engine.generate_flashcards(
-                topic=state.topic,
+            flashcard_set = await asyncio.to_thread(
+                self.content_engine.generate_flashcards,
+                topic=state["topic"],
                 num=5,
                 custom_instructions=f"Use this context to generate accurate flashcards:\n{context}"
             )
             
-            state.flashcards = flashcard_set
-            state.current_stage = "complete"
+            return {"flashcards": flashcard_set, "current_stage": "complete"}
             
         except Exception as e:
             print(f"Flashcard generation error: {str(e)}")
-            state.flashcards = None
-            
-        return state
+            return {"flashcards": None}
 
     
-    def generate_content(self, question: str, pdf_title: str, output_type: str = "podcast") -> Dict[str, Any]:
-        """Generate either a podcast or flashcards based on the specified output type"""
+    async def generate_content(
+        self,
+        question: str,
+        pdf_title: str,
+        output_type: Union[str, List[str]] = "podcast"
+    ) -> Dict[str, Any]:
+        """
+        Generate one or more content types from a single graph run.
+        Accepts a single output type or a list; each requested type is generated
+        in parallel and its result keys are merged into the returned dictionary.
+        """
+        output_types = [output_type] if isinstance(output_type, str) else list(output_type)
+        unsupported = [t for t in output_types if t not in CONTENT_NODES]
+        if unsupported:
+            raise ValueError(f"Unsupported output type(s): {', '.join(unsupported)}")
+
         # First retrieve RAG context regardless of output type
-        print(f"DEBUG: Generating content for query: {question}, Output Type: {output_type}")
+        print(f"DEBUG: Generating content for query: {question}, Output Types: {output_types}")
         print(f"DEBUG: Using PDF Title: {pdf_title}")
-        rag_response = self.rag_app.query_document(question, pdf_title)
+        rag_response = await asyncio.to_thread(self.query_rag, question, pdf_title)
 
-        
         # Check for errors in RAG response
         if "error" in rag_response:
             print(f"ERROR: {rag_response['error']}")
             raise ValueError(f"Failed to retrieve context: {rag_response['error']}")
+
+        graph = self.create_graph()
         
-        if output_type == "quiz":
-            graph = self.create_graph()
-            
-            initial_state = EnhancedGraphState(
-                messages=[HumanMessage(content=f"Create {output_type} about: {question}")],
-                topic=question,
-                output_type=output_type,
-                rag_context=RAGContext(
-                    question=question,
-                    pdf_title=pdf_title,
-                    answer=rag_response["answer"],
-                    evidence=rag_response["relevant_chunks"]
-                ),
+        initial_state = EnhancedGraphState(
+            messages=[HumanMessage(content=f"Create {', '.join(output_types)} about: {question}")],
+            transcript=f"Create {', '.join(output_types)} about: {question}",
+            topic=question,
+            output_types=output_types,
+            rag_context=RAGContext(
+                question=question,
                 pdf_title=pdf_title,
-                cache_result=None,
-                s3_url=None,
-                quiz=None
-            )
+                answer=rag_response["answer"],
+                evidence=rag_response["relevant_chunks"]
+            ),
+            pdf_title=pdf_title
+        )
+        
+        try:
+            final_state = await graph.ainvoke(initial_state)
             
-            try:
-                final_state = graph.invoke(initial_state)
-                
-                if final_state.get("quiz") is None:
-                    raise ValueError("No quiz was generated")
-                    
-                quiz_dict = self.quiz_generator.format_quiz_for_display(final_state["quiz"])
-                
-                return {
-                    "topic": question,
-                    "quiz": quiz_dict,
-                    "conversation_history": [m.content for m in final_state["messages"]],
-                    "source_pdf": pdf_title,
-                    "rag_context": {
-                        "answer": rag_response["answer"],
-                        "evidence": rag_response["relevant_chunks"]
-                    }
+            result = {
+                "topic": question,
+                "rag_context": {
+                    "answer": rag_response["answer"],
+                    "evidence": rag_response["relevant_chunks"]
                 }
-            except Exception as e:
-                print(f"Error generating quiz: {str(e)}")
-                raise
-        
+            }
+            # Blog and tweet results have never carried the history or the source PDF
+            if any(t in HISTORY_OUTPUT_TYPES for t in output_types):
+                result["conversation_history"] = [m.content for m in final_state["messages"]]
+                result["source_pdf"] = pdf_title
+            for content_type in output_types:
+                result.update(self.format_content_result(content_type, final_state))
+            # A cached podcast on its own reports no RAG context, as generate_podcast does
+            if output_types == ["podcast"] and result["cached"]:
+                result["rag_context"] = None
+            return result
+        except Exception as e:
+            print(f"Error generating {', '.join(output_types)}: {str(e)}")
+            raise
+
+    def format_content_result(self, output_type: str, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the result entries for one output type from the final graph state"""
+        if output_type == "podcast":
+            cache_result = final_state.get("cache_result")
+            return {
+                "script": final_state.get("script"),
+                "s3_url": final_state.get("s3_url"),
+                "cached": cache_result.found if cache_result else False
+            }
+
+        if output_type == "quiz":
+            if final_state.get("quiz") is None:
+                raise ValueError("No quiz was generated")
+            return {"quiz": self.quiz_generator.format_quiz_for_display(final_state["quiz"])}
+
         if output_type == "flashcards":
-            graph = self.create_graph()
-            
-            initial_state = EnhancedGraphState(
-                messages=[HumanMessage(content=f"Create {output_type} about: {question}")],
-                topic=question,
-                output_type=output_type,
-                rag_context=RAGContext(
-                    question=question,
-                    pdf_title=pdf_title,
-                    answer=rag_response["answer"],
-                    evidence=rag_response["relevant_chunks"]
-                ),
-                pdf_title=pdf_title,
-                cache_result=None,
-                s3_url=None,
-                flashcards=None
-            )
-            
-            try:
-                final_state = graph.invoke(initial_state)
-                # print(f"DEBUG: Final State: {final_state}")
-                if final_state.get("flashcards") is None:
-                    raise ValueError("No flashcards were generated")
-                    
-                # Convert flashcards to dictionary format
-                flashcards_dict = {
+            if final_state.get("flashcards") is None:
+                raise ValueError("No flashcards were generated")
+            return {
+                "flashcards": {
                     "title": final_state["flashcards"].title,
                     "flashcards": [
                         {
@@ -459,282 +526,242 @@ class PodcastGenerator:
                         for card in final_state["flashcards"].flashcards
                     ]
                 }
-                
-                return {
-                    "topic": question,
-                    "flashcards": flashcards_dict,
-                    "conversation_history": [m.content for m in final_state["messages"]],
-                    "source_pdf": pdf_title,
-                    "rag_context": {
-                        "answer": rag_response["answer"],
-                        "evidence": rag_response["relevant_chunks"]
-                    }
-                }
-            except Exception as e:
-                print(f"Error generating flashcards: {str(e)}")
-                raise
+            }
 
         if output_type == "blog":
-            graph = self.create_graph()
-            
-            initial_state = EnhancedGraphState(
-                messages=[HumanMessage(content=f"Create {output_type} about: {question}")],
-                topic=question,
-                output_type=output_type,
-                rag_context=RAGContext(
-                    question=question,
-                    pdf_title=pdf_title,
-                    answer=rag_response["answer"],
-                    evidence=rag_response["relevant_chunks"]
-                ),
-                pdf_title=pdf_title,
-                cache_result=None
-            )
-            
-            try:
-                final_state = graph.invoke(initial_state)
-                
-                # Explicitly extract blog content
-                blog_content = final_state.get("blog_content")
-                
-                if not blog_content:
-                    raise ValueError("No blog was generated")
-
-                return {
-                    "topic": question,
-                    "blog_content": {
-                        "title": blog_content.title,
-                        "body": blog_content.body
-                    },
-                    "rag_context": {
-                        "answer": rag_response["answer"],
-                        "evidence": rag_response["relevant_chunks"]
-                    }
+            blog_content = final_state.get("blog_content")
+            if not blog_content:
+                raise ValueError("No blog was generated")
+            return {
+                "blog_content": {
+                    "title": blog_content.title,
+                    "body": blog_content.body
                 }
-            except Exception as e:
-                print(f"Error generating blog: {str(e)}")
-
+            }
 
         if output_type == "tweet":
-            graph = self.create_graph()
-            print(f"DEBUG: Generating tweet for query: {question}, RAG Response: {rag_response}")
-            initial_state = EnhancedGraphState(
-                messages=[HumanMessage(content=f"Create {output_type} about: {question}")],
-                topic=question,
-                output_type=output_type,
-                rag_context=RAGContext(
-                    question=question,
-                    pdf_title=pdf_title,
-                    answer=rag_response["answer"],
-                    evidence=rag_response["relevant_chunks"]
-                ),
-                pdf_title=pdf_title,
-                cache_result=None,
-                tweet_content=None
-            )
-            
-            try:
-                final_state = graph.invoke(initial_state)
-                
-                # Ensure tweet content is returned
-                tweet_content = final_state.get("tweet_content")
-                
-                if not tweet_content:
-                    raise ValueError("No tweet was generated")
-
-                return {
-                    "topic": question,
-                    "tweet_content": tweet_content.tweet,  # Explicitly access .tweet
-                    "rag_context": {
-                        "answer": rag_response["answer"],
-                        "evidence": rag_response["relevant_chunks"]
-                    }
-                }
-            except Exception as e:
-                print(f"Error generating tweet: {str(e)}")
-                raise
-
-        else:  # podcast generation
-            return self.generate_podcast(question=question, pdf_title=pdf_title)
+            tweet_content = final_state.get("tweet_content")
+            if not tweet_content:
+                raise ValueError("No tweet was generated")
+            return {"tweet_content": tweet_content.tweet}
+
+        raise ValueError(f"Unsupported output type: {output_type}")
+
+    async def check_cache(self, state: EnhancedGraphState) -> Dict[str, Any]:
+        cached_result = await asyncio.to_thread(
+            self.cache.get_cached_podcast,
+            state["rag_context"].question, 
+            state["rag_context"].pdf_title
+        )
         
+        if cached_result:
+            return {
+                "cache_result": CacheResult(found=True, data=cached_result),
+                "s3_url": cached_result.get("s3_url"),
+                "script": cached_result.get("script"),
+                "messages": [AIMessage(content=f"Retrieved cached podcast: {cached_result.get('s3_url')}")],
+                "transcript": f"Retrieved cached podcast: {cached_result.get('s3_url')}",
+                "current_stage": "complete"
+            }
         
-       
+        return {"cache_result": CacheResult(found=False), "current_stage": "cache_check"}
 
-    def check_cache(self, state: EnhancedGraphState) -> EnhancedGraphState:
-        cached_result = self.cache.get_cached_podcast(
-            state.rag_context.question, 
-            state.rag_context.pdf_title
-        )
+    def query_rag(self, question: str, pdf_title: str) -> Dict[str, Any]:
+        """Query the document, reusing the cached response for a matching question and PDF"""
+        cached_response = self.rag_cache.get_cached_response(question, pdf_title)
+        if cached_response:
+            return cached_response
         
-        if cached_result:
-            state.cache_result = CacheResult(
-                found=True,
-                data=cached_result
-            )
-            state.s3_url = cached_result.get("s3_url")
-            state.script = cached_result.get("script")
-            state.messages.append(
-                AIMessage(content=f"Retrieved cached podcast: {state.s3_url}")
-            )
-        else:
-            state.cache_result = CacheResult(found=False)
-            
-        state.current_stage = "cache_check"
-        return state
+        rag_response = self.rag_app.query_document(question, pdf_title)
+        if "error" not in rag_response:
+            self.rag_cache.cache_response(question, pdf_title, rag_response)
+        return rag_response
 
     def route_from_cache(self, state: EnhancedGraphState) -> str:
-        return "cached" if state.cache_result and state.cache_result.found else "not_cached"
+        cache_result = state.get("cache_result")
+        return "cached" if cache_result and cache_result.found else "not_cached"
 
 
-    def retrieve_context(self, state: EnhancedGraphState) -> EnhancedGraphState:
-        if not state.rag_context or not state.pdf_title:
+    async def retrieve_context(self, state: EnhancedGraphState) -> Dict[str, Any]:
+        rag_context = state.get("rag_context")
+        if not rag_context or not state.get("pdf_title"):
             raise ValueError("RAG context or PDF title not provided")
             
-        rag_response = self.rag_app.query_document(
-            state.rag_context.question, 
-            state.pdf_title
-        )
-        
-        state.rag_context.answer = rag_response["answer"]
-        state.rag_context.evidence = rag_response["relevant_chunks"]
+        # generate_content already retrieved the context; only query when it is missing
+        if rag_context.answer is None:
+            rag_response = await asyncio.to_thread(
+                self.query_rag,
+                rag_context.question, 
+                state["pdf_title"]
+            )
+            
+            rag_context = rag_context.model_copy(update={
+                "answer": rag_response["answer"],
+                "evidence": rag_response["relevant_chunks"]
+            })
         
+        # The evidence itself reaches the prompts as separate messages; keep it out of the history
         context_message = f"""Research Context:
-        Answer: {rag_response['answer']}
-        Evidence: {' '.join(rag_response['relevant_chunks'])}"""
+        Answer: {rag_context.answer}
+        Retrieved {len(rag_context.evidence)} evidence chunks"""
         
-        state.messages.append(AIMessage(content=context_message))
-        state.current_stage = "rag_retrieval"
-        return state
+        return {
+            "rag_context": rag_context,
+            "messages": [AIMessage(content=context_message)],
+            "transcript": context_message,
+            "current_stage": "rag_retrieval"
+        }
             
 
-    def expand_topic(self, state: EnhancedGraphState) -> EnhancedGraphState:
-        prompt = ChatPromptTemplate.from_template(TOPIC_EXPANSION_PROMPT)
-        
-        rag_context = f"""Answer: {state.rag_context.answer}
-        Evidence: {' '.join(state.rag_context.evidence)}"""
-        
-        formatted_prompt = prompt.format_messages(
-            topic=state.topic,
-            rag_context=rag_context,
-            messages="\n".join([msg.content for msg in state.messages])
+    def evidence_messages(self, rag_context: RAGContext) -> List[HumanMessage]:
+        """One message per evidence chunk, so chunks are never concatenated into one string"""
+        return [HumanMessage(content=chunk) for chunk in rag_context.evidence]
+
+    async def expand_topic(self, state: EnhancedGraphState) -> Dict[str, Any]:
+        formatted_prompt = _TOPIC_PROMPT.format_messages(
+            topic=state["topic"],
+            answer=state["rag_context"].answer,
+            evidence_msgs=self.evidence_messages(state["rag_context"]),
+            messages=state["transcript"]
         )
         
-        response = self.llm.invoke(formatted_prompt)
-        state.messages.append(AIMessage(content=response.content))
-        state.current_stage = "topic_expansion"
-        return state
+        response = await self.llm.ainvoke(formatted_prompt)
+        return {
+            "messages": [AIMessage(content=response.content)],
+            "transcript": response.content,
+            "current_stage": "topic_expansion"
+        }
 
-    def generate_script(self, state: EnhancedGraphState) -> EnhancedGraphState:
-        prompt = ChatPromptTemplate.from_template(SCRIPT_GENERATION_PROMPT)
-        
-        rag_context = f"""Answer: {state.rag_context.answer}
-        Evidence: {' '.join(state.rag_context.evidence)}"""
-        
-        formatted_prompt = prompt.format_messages(
-            rag_context=rag_context,
-            messages="\n".join([msg.content for msg in state.messages]),
-            outline=state.messages[-1].content
+    async def generate_script(self, state: EnhancedGraphState) -> Dict[str, Any]:
+        formatted_prompt = _SCRIPT_PROMPT.format_messages(
+            answer=state["rag_context"].answer,
+            evidence_msgs=self.evidence_messages(state["rag_context"]),
+            outline=state["messages"][-1].content
         )
         
-        response = self.llm.invoke(formatted_prompt)
+        response = await self.llm.ainvoke(formatted_prompt)
         
-        try:
-            script_structured = PodcastScript.parse_raw(response.content)
-            state.script = script_structured.json()
-        except:
-            state.script = response.content
-            
-        state.messages.append(AIMessage(content=response.content))
-        state.current_stage = "script_generation"
-        return state
-
-    def generate_tts(self, state: EnhancedGraphState) -> EnhancedGraphState:
-        if state.cache_result and state.cache_result.found:
-            state.current_stage = "complete"
-            return state
+        script = response.content
+        if looks_like_json(script):
+            try:
+                script = PodcastScript.model_validate_json(script).model_dump_json()
+            except ValidationError:
+                pass
             
-        if not state.script:
+        return {
+            "script": script,
+            "messages": [AIMessage(content=response.content)],
+            "transcript": response.content,
+            "current_stage": "script_generation"
+        }
+
+    async def generate_tts(self, state: EnhancedGraphState) -> Dict[str, Any]:
+        if not state.get("script"):
             raise ValueError("No script available for TTS generation.")
         
-        try:
-            script = PodcastScript.parse_raw(state.script)
-        except:
-            script = self.parse_unstructured_script(state.script)
+        script = None
+        if looks_like_json(state["script"]):
+            try:
+                script = PodcastScript.model_validate_json(state["script"], context={"voices": self.voice_ids})
+            except ValidationError:
+                pass
+        if script is None:
+            script = self.parse_unstructured_script(state["script"])
         
-        audio_segments = []
-        for segment in script.segments:
-            voice_id = self.voice_ids.get(segment.speaker)
-            audio_data = self.synthesize_speech(segment.text, voice_id)
-            audio_segments.append(audio_data)
+        missing_voices = {segment.speaker for segment in script.segments if segment.voice_id is None}
+        if missing_voices:
+            raise ValueError(f"No voice configured for speakers: {', '.join(sorted(missing_voices))}")
         
-        combined_audio = AudioSegment.empty()
-        for audio in audio_segments:
-            combined_audio += audio + AudioSegment.silent(duration=500)
+        # Synthesis, muxing and upload run as one pipeline; build the cache payload meanwhile
+        upload = asyncio.create_task(self.stream_podcast_audio(
+            script,
+            podcast_title=state["topic"],
+            pdf_title=state["pdf_title"]
+        ))
         
-        temp_file = f"temp_podcast_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
-        combined_audio.export(temp_file, format="mp3")
+        podcast_data = {
+            "topic": state["topic"],
+            "script": state["script"],
+            "conversation_history": [m.content for m in state["messages"]],
+            "source_pdf": state["pdf_title"],
+            "rag_context": {
+                "answer": state["rag_context"].answer,
+                "evidence": state["rag_context"].evidence
+            }
+        }
         
-        try:
-            s3_url = self.s3_storage.upload_file(
-                file_path=temp_file,
-                podcast_title=state.topic,
-                pdf_title=state.pdf_title
-            )
-            
-            self.cache.cache_podcast(
-                state.rag_context.question,
-                state.pdf_title,
-                {
-                    "topic": state.topic,
-                    "script": state.script,
-                    "conversation_history": [m.content for m in state.messages],
-                    "source_pdf": state.pdf_title,
-                    "s3_url": s3_url,
-                    "rag_context": {
-                        "answer": state.rag_context.answer,
-                        "evidence": state.rag_context.evidence
-                    }
-                }
-            )
-            
-            state.s3_url = s3_url
-            state.messages.append(
-                AIMessage(content=f"Podcast audio generated and uploaded to S3: {s3_url}")
-            )
-            
-        except Exception as e:
-            print(f"Warning: S3 upload failed - {str(e)}")
-            state.messages.append(
-                AIMessage(content=f"Warning: S3 upload failed. Podcast saved locally as {temp_file}")
-            )
+        s3_url = await upload
+        podcast_data["s3_url"] = s3_url
+        
+        await asyncio.to_thread(
+            self.cache.cache_podcast,
+            state["rag_context"].question,
+            state["pdf_title"],
+            podcast_data
+        )
+        
+        return {
+            "s3_url": s3_url,
+            "messages": [AIMessage(content=f"Podcast audio generated and uploaded to S3: {s3_url}")],
+            "transcript": f"Podcast audio generated and uploaded to S3: {s3_url}",
+            "current_stage": "complete"
+        }
+
+    async def stream_podcast_audio(self, script: PodcastScript, podcast_title: str, pdf_title: str) -> str:
+        """
+        Stream every segment from ElevenLabs concurrently, pipe them in script order
+        through ffmpeg and upload ffmpeg's output to S3 while it is being produced.
+        Returns the S3 URL of the podcast.
+        """
+        silence = await render_silence()
+        semaphore = asyncio.Semaphore(ELEVENLABS_MAX_CONCURRENCY)
         
-        state.current_stage = "complete"
-        return state
+        async with self.create_tts_client() as client:
+            return await stream_segments_to_upload(
+                [
+                    partial(self.stream_speech, client, semaphore, segment.text, segment.voice_id)
+                    for segment in script.segments
+                ],
+                silence,
+                lambda audio_stream: self.s3_storage.upload_stream(
+                    audio_stream, podcast_title=podcast_title, pdf_title=pdf_title
+                )
+            )
 
     def parse_unstructured_script(self, script_text: str) -> PodcastScript:
-        segments = []
-        for line in script_text.split('\n'):
-            if line.strip() == "":
-                continue
-            if line.startswith("Speaker 1:"):
-                speaker = "Speaker 1"
-                text = line.replace("Speaker 1:", "").strip()
-            elif line.startswith("Speaker 2:"):
-                speaker = "Speaker 2"
-                text = line.replace("Speaker 2:", "").strip()
-            else:
-                speaker = "Speaker 1"
-                text = line.strip()
-            segments.append(PodcastSegment(speaker=speaker, text=text))
-        return PodcastScript(segments=segments)
-
-    def synthesize_speech(self, text: str, voice_id: str) -> AudioSegment:
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}/stream"
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.elevenlabs_api_key
-        }
+        # Unlabelled lines are attributed to Speaker 1; blank lines are skipped
+        segments = [
+            PodcastSegment(speaker=match.group(1) or "Speaker 1", text=match.group(2))
+            for match in _SPEAKER_RE.finditer(script_text)
+            if match.group(2)
+        ]
+        return PodcastScript.model_validate({"segments": segments}, context={"voices": self.voice_ids})
+
+    def create_tts_client(self) -> httpx.AsyncClient:
+        """
+        Create a keep-alive ElevenLabs client shared by all segments of one podcast.
+        A client is bound to the event loop it first runs on, and API callers run each
+        generation in its own loop, so the pool lives for one generate_tts call.
+        """
+        return httpx.AsyncClient(
+            base_url=ELEVENLABS_API_URL,
+            headers=self.elevenlabs_headers,
+            timeout=60,
+            limits=httpx.Limits(max_keepalive_connections=16)
+        )
+
+    async def stream_speech(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        text: str,
+        voice_id: str,
+        queue: asyncio.Queue
+    ) -> None:
+        """
+        Stream one segment's MP3 chunks from ElevenLabs into its queue.
+        The queue ends with None, or with the exception if the request failed.
+        """
         data = {
             "text": text,
             "model_id": "eleven_turbo_v2_5",
@@ -744,20 +771,33 @@ class PodcastGenerator:
             }
         }
         
-        response = requests.post(url, headers=headers, json=data)
-        
-        if response.status_code != 200:
-            raise ValueError(f"ElevenLabs API Error: {response.status_code} - {response.text}")
+        try:
+            async with semaphore:
+                async with client.stream(
+                    "POST",
+                    f"/text-to-speech/{voice_id}/stream",
+                    params={"output_format": ELEVENLABS_OUTPUT_FORMAT},
+                    json=data
+                ) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        raise ValueError(f"ElevenLabs API Error: {response.status_code} - {response.text}")
+                    
+                    async for chunk in response.aiter_bytes(8192):
+                        await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+            return
         
-        audio = AudioSegment.from_file(io.BytesIO(response.content), format="mp3")
-        return audio
+        await queue.put(None)
     
-    def generate_podcast(self, question: str, pdf_title: str) -> Dict[str, Any]:
+    async def generate_podcast(self, question: str, pdf_title: str) -> Dict[str, Any]:
         """Generate a podcast based on the provided question and PDF"""
         initial_state = EnhancedGraphState(
             messages=[HumanMessage(content=f"Create a podcast about: {question}")],
+            transcript=f"Create a podcast about: {question}",
             topic=question,
-            output_type="podcast",
+            output_types=["podcast"],
             rag_context=RAGContext(
                 question=question,
                 pdf_title=pdf_title
@@ -770,14 +810,14 @@ class PodcastGenerator:
         
         try:
             graph = self.create_graph()
-            final_state = graph.invoke(initial_state)
+            final_state = await graph.ainvoke(initial_state)
             
             return {
                 "topic": question,
-                "script": final_state["script"],
+                "script": final_state.get("script"),
                 "conversation_history": [m.content for m in final_state["messages"]],
                 "source_pdf": pdf_title,
-                "s3_url": final_state["s3_url"],
+                "s3_url": final_state.get("s3_url"),
                 "cached": final_state["cache_result"].found if final_state["cache_result"] else False,
                 "rag_context": {
                     "answer": final_state["rag_context"].answer,
@@ -791,7 +831,11 @@ class PodcastGenerator:
     
 
     def process_document(self, pdf_path: str) -> bool:
-        return self.rag_app.process_document(pdf_path)
+        processed = self.rag_app.process_document(pdf_path)
+        if processed:
+            # Answers cached before re-indexing may no longer match the document
+            self.rag_cache.clear_cache()
+        return processed
 
     def list_available_pdfs(self) -> List[str]:
         return self.rag_app.list_available_pdfs()
@@ -855,7 +899,7 @@ def handle_podcast_generation(generator: PodcastGenerator):
     print(f"Using PDF: {selected_pdf}")
     
     try:
-        result = generator.generate_podcast(question, selected_pdf)
+        result = asyncio.run(generator.generate_podcast(question, selected_pdf))
         
         if result.get('cached'):
             print("\nRetrieved cached podcast!")
@@ -865,14 +909,32 @@ def handle_podcast_generation(generator: PodcastGenerator):
         print(f"S3 URL: {result['s3_url']}")
         
         # Save result to local file for reference
-        with open("podcast_output.json", "w") as f:
-            json.dump(result, f, indent=2)
+        with open("podcast_output.json", "wb") as f:
+            f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
             
         print("\nResults saved to podcast_output.json")
         
     except Exception as e:
         print(f"\nError generating podcast: {str(e)}")
 
+# Result files are written off the prompt thread; pending writes finish before exit
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+atexit.register(_IO_POOL.shutdown, wait=True)
+
+# One detailed-feedback block, filled from a grading feedback entry
+_FB_TMPL = "\nQuestion {question_num}:\nYour Answer: {user_answer}\nCorrect Answer: {correct_answer}"
+
+def _write_json(path: str, data: Dict[str, Any]):
+    """Serialize data and write it to path"""
+    # One large buffer so the serialized bytes go out in a single sequential write
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.write(orjson.dumps(data))
+
+def _report_save(path: str, future: Future):
+    """Report the outcome of a background result save"""
+    if future.exception():
+        print(f"\nError saving results to {path}: {str(future.exception())}")
+
 def handle_content_generation(generator: PodcastGenerator):
     """Handle the content generation process with enhanced user interaction and quiz features"""
     pdfs = generator.list_available_pdfs()
@@ -924,7 +986,7 @@ def handle_content_generation(generator: PodcastGenerator):
     print(f"Generating: {output_type}")
     
     try:
-        result = generator.generate_content(question, selected_pdf, output_type)
+        result = asyncio.run(generator.generate_content(question, selected_pdf, output_type))
         
         if output_type == "podcast":
             if result.get('cached'):
@@ -954,30 +1016,35 @@ def handle_content_generation(generator: PodcastGenerator):
                 print(f"Recommended Time: {quiz_data['recommended_time']} minutes")
                 
                 # Interactive quiz taking
-                take_quiz = input("\nWould you like to take the quiz now? (y/n): ").lower().strip() == 'y'
+                take_quiz = input("\nWould you like to take the quiz now? (y/n): ").lstrip()[:1] in ('y', 'Y')
                 
                 if take_quiz:
                     user_answers = []
                     score = 0
                     total_questions = len(quiz_data['questions'])
                     
-                    print("\n=== Quiz Started ===")
+                    # Local bindings for the per-question loop
+                    _print = print
+                    _input = input
+                    add_answer = user_answers.append
+                    
+                    _print("\n=== Quiz Started ===")
                     for i, q in enumerate(quiz_data['questions'], 1):
-                        print(f"\nQuestion {i} of {total_questions} ({q['difficulty']}):")
-                        print(f"Q: {q['question']}")
-                        print("\nOptions:")
+                        _print(f"\nQuestion {i} of {total_questions} ({q['difficulty']}):")
+                        _print(f"Q: {q['question']}")
+                        _print("\nOptions:")
                         for j, opt in enumerate(q['options'], 1):
-                            print(f"  {j}. {opt}")
+                            _print(f"  {j}. {opt}")
                             
                         while True:
                             try:
-                                answer = int(input("\nEnter your answer (1-4): "))
+                                answer = int(_input("\nEnter your answer (1-4): "))
                                 if 1 <= answer <= 4:
-                                    user_answers.append(q['options'][answer-1])
+                                    add_answer(q['options'][answer-1])
                                     break
-                                print("Please enter a number between 1 and 4.")
+                                _print("Please enter a number between 1 and 4.")
                             except (ValueError, IndexError):
-                                print("Invalid input. Please enter a number between 1 and 4.")
+                                _print("Invalid input. Please enter a number between 1 and 4.")
                     
                     # Grade the quiz
                     grading_result = generator.quiz_generator.grade_quiz(
@@ -990,26 +1057,26 @@ def handle_content_generation(generator: PodcastGenerator):
                     print(f"Score: {grading_result['score']:.1f}%")
                     print(f"Correct Answers: {grading_result['correct_count']} out of {grading_result['total_questions']}")
                     
-                    show_feedback = input("\nWould you like to see detailed feedback? (y/n): ").lower().strip() == 'y'
+                    show_feedback = input("\nWould you like to see detailed feedback? (y/n): ").lstrip()[:1] in ('y', 'Y')
                     if show_feedback:
-                        print("\n=== Detailed Feedback ===")
+                        # Keyed by question number, so sparse or out-of-order feedback still resolves
+                        qmap = {i: q for i, q in enumerate(quiz_data['questions'], 1)}
+                        # Buffer the whole section and emit it with a single write
+                        buf = ["\n=== Detailed Feedback ==="]
                         for fb in grading_result['feedback']:
-                            q_num = fb['question_num']
-                            q_data = quiz_data['questions'][q_num-1]
-                            print(f"\nQuestion {q_num}:")
-                            print(f"Your Answer: {fb['user_answer']}")
-                            print(f"Correct Answer: {fb['correct_answer']}")
+                            buf.append(_FB_TMPL.format_map(fb))
                             if not fb['correct']:
-                                print(f"Explanation: {q_data['explanation']}")
+                                buf.append(f"Explanation: {qmap[fb['question_num']]['explanation']}")
+                        sys.stdout.write("\n".join(buf) + "\n")
+                        sys.stdout.flush()
                 else:
-                    # Just display the quiz without taking it
-                    print("\nQuiz Questions Preview:")
+                    # Just display the quiz without taking it, written out in one go
+                    parts = ["\nQuiz Questions Preview:"]
                     for i, q in enumerate(quiz_data['questions'], 1):
-                        print(f"\nQuestion {i} ({q['difficulty']}):")
-                        print(f"Q: {q['question']}")
-                        print("Options:")
-                        for j, opt in enumerate(q['options'], 1):
-                            print(f"  {j}. {opt}")
+                        parts.append(f"\nQuestion {i} ({q['difficulty']}):\nQ: {q['question']}\nOptions:")
+                        parts.extend(f"  {j}. {opt}" for j, opt in enumerate(q['options'], 1))
+                    sys.stdout.write("\n".join(parts) + "\n")
+                    sys.stdout.flush()
         elif output_type == "blog":
             print("\nGenerated blog!")
             if result.get('blog_content'):
@@ -1022,16 +1089,33 @@ def handle_content_generation(generator: PodcastGenerator):
                 print(f"\nTweet: {result['tweet_content']}")
         
         # Save result to local file for reference
-        output_filename = f"{output_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_output.json"
-        with open(output_filename, "w") as f:
-            json.dump(result, f, indent=2)
+        output_filename = f"{output_type}_{time.time_ns()}_output.json"
+        future = _IO_POOL.submit(_write_json, output_filename, result)
+        future.add_done_callback(lambda f: _report_save(output_filename, f))
             
-        print(f"\nResults saved to {output_filename}")
+        print(f"\nSaving results to {output_filename} in the background...")
         
     except Exception as e:
         print(f"\nError generating {output_type}: {str(e)}")
         print("Please try again or choose a different output type.")
 
+def handle_list_pdfs(generator: PodcastGenerator):
+    """List the documents that have been indexed"""
+    pdfs = generator.list_available_pdfs()
+    print("\nAvailable PDFs:")
+    if not pdfs:
+        print("No documents indexed yet.")
+    else:
+        for pdf in pdfs:
+            print(f"- {pdf}")
+
+# Menu choices other than exit, mapped to their handlers
+MENU_ACTIONS = {
+    "1": handle_list_pdfs,
+    "2": handle_index_document,
+    "3": handle_content_generation
+}
+
 def main():
     """Main execution loop"""
     try:
@@ -1042,20 +1126,9 @@ def main():
             display_menu()
             choice = input("Enter your choice (1-4): ").strip()
             
-            if choice == "1":
-                pdfs = generator.list_available_pdfs()
-                print("\nAvailable PDFs:")
-                if not pdfs:
-                    print("No documents indexed yet.")
-                else:
-                    for pdf in pdfs:
-                        print(f"- {pdf}")
-                        
-            elif choice == "2":
-                handle_index_document(generator)
-                
-            elif choice == "3":
-                handle_content_generation(generator)
+            action = MENU_ACTIONS.get(choice)
+            if action:
+                action(generator)
                 
             elif choice == "4":
                 print("\nExiting Content Generator...")
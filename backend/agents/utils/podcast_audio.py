@@ -0,0 +1,150 @@
+import os
+import asyncio
+import threading
+from typing import Awaitable, Callable, List, Optional
+
+SEGMENT_GAP_SECONDS = 0.5
+
+# Re-mux concatenated MP3 frames from stdin into one clean MP3 stream on stdout
+FFMPEG_REMUX_COMMAND = [
+    "ffmpeg", "-loglevel", "error",
+    "-f", "mp3", "-i", "pipe:0",
+    "-c", "copy", "-write_xing", "0",
+    "-f", "mp3", "pipe:1"
+]
+
+async def run_ffmpeg(*args: str) -> bytes:
+    """Run ffmpeg with the given arguments and return its stdout, raising if it exits with an error"""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y", "-loglevel", "error", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode().strip()}")
+    return stdout
+
+_silence: Optional[bytes] = None
+
+async def render_silence() -> bytes:
+    """Encode the gap between segments in the same MP3 format as the TTS output, once per process"""
+    global _silence
+    if _silence is None:
+        _silence = await run_ffmpeg(
+            "-f", "lavfi", "-i", "anullsrc=r=44100:cl=mono",
+            "-t", str(SEGMENT_GAP_SECONDS),
+            "-c:a", "libmp3lame", "-b:a", "128k",
+            "-write_xing", "0", "-id3v2_version", "0",
+            "-f", "mp3", "pipe:1"
+        )
+    return _silence
+
+class AudioStreamAborted(IOError):
+    """Raised to the uploader when the audio pipeline fails before the stream is complete"""
+
+class AudioStream:
+    """
+    Readable end of the ffmpeg output pipe, handed to the uploader.
+    The final read blocks until the pipeline reports its outcome, and fails if it was
+    aborted, so a broken pipeline never completes a truncated upload.
+    """
+
+    def __init__(self, fd: int):
+        self._file = os.fdopen(fd, "rb")
+        self._finished = threading.Event()
+        self._aborted = False
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        if not data:
+            self._finished.wait()
+        if self._aborted:
+            raise AudioStreamAborted("Podcast audio stream was aborted")
+        return data
+
+    def finish(self, aborted: bool = False) -> None:
+        self._aborted = aborted
+        self._finished.set()
+
+    def close(self) -> None:
+        self._file.close()
+
+async def pipe_segments(queues: List[asyncio.Queue], silence: bytes, stdin: asyncio.StreamWriter) -> None:
+    """Write the streamed segments to ffmpeg in queue order, each followed by a silent gap"""
+    for queue in queues:
+        while (chunk := await queue.get()) is not None:
+            if isinstance(chunk, Exception):
+                raise chunk
+            stdin.write(chunk)
+            await stdin.drain()
+        stdin.write(silence)
+        await stdin.drain()
+    stdin.close()
+
+def _upload_and_close(upload: Callable[[AudioStream], str], audio_stream: AudioStream) -> str:
+    """Run the upload, closing the pipe so ffmpeg stops if the upload fails"""
+    try:
+        return upload(audio_stream)
+    finally:
+        audio_stream.close()
+
+async def stream_segments_to_upload(
+    producers: List[Callable[[asyncio.Queue], Awaitable[None]]],
+    silence: bytes,
+    upload: Callable[[AudioStream], str]
+) -> str:
+    """
+    Run every segment producer concurrently, pipe their output in order through ffmpeg
+    and hand ffmpeg's output to the upload function (run in a thread) while it is produced.
+
+    Each producer fills its queue with audio chunks and ends it with None, or with the
+    exception that stopped it. Returns whatever the upload function returns.
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *FFMPEG_REMUX_COMMAND,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=write_fd,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+
+    audio_stream = AudioStream(read_fd)
+    upload_task = asyncio.create_task(asyncio.to_thread(_upload_and_close, upload, audio_stream))
+
+    try:
+        queues = [asyncio.Queue() for _ in producers]
+        tasks = [asyncio.create_task(producer(queue)) for producer, queue in zip(producers, queues)]
+        try:
+            await pipe_segments(queues, silence, process.stdin)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {stderr.decode().strip()}")
+
+        audio_stream.finish()
+        return await upload_task
+
+    except BaseException as e:
+        audio_stream.finish(aborted=True)
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        await asyncio.gather(upload_task, return_exceptions=True)
+
+        # A failed upload closes the pipe and ffmpeg dies of it, so the error seen
+        # here is then a broken pipe; report the upload's own error instead
+        upload_error = None if upload_task.cancelled() else upload_task.exception()
+        if upload_error is not None and upload_error is not e and not isinstance(upload_error, AudioStreamAborted):
+            raise upload_error from e
+        raise
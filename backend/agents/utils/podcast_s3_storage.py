@@ -1,16 +1,23 @@
 # First create a new file called s3_storage.py
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 import os
-from datetime import datetime
 import re
+import uuid
 
 class S3Storage:
     def __init__(self, bucket_name: str):
         """Initialize S3 storage handler"""
         self.s3_client = boto3.client('s3')
         self.bucket_name = bucket_name
+        # Upload larger podcasts as parallel multipart parts
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            max_concurrency=8,
+            use_threads=True
+        )
 
     def sanitize_filename(self, filename: str) -> str:
         """Sanitize filename to be S3 compatible"""
@@ -19,24 +26,33 @@ class S3Storage:
         # Convert to lowercase for consistency
         return sanitized.lower()
 
+    def build_podcast_key(self, podcast_title: str, pdf_title: str) -> str:
+        """Create the S3 key with folder structure: podcast/{pdf_title}/{podcast_title}_{uuid}.mp3"""
+        # Sanitize the podcast and PDF titles
+        safe_podcast_title = self.sanitize_filename(podcast_title)
+        safe_pdf_title = self.sanitize_filename(pdf_title)
+        
+        # A random suffix keeps concurrent uploads of the same title from overwriting each other
+        return f"podcast/{safe_pdf_title}/{safe_podcast_title}_{uuid.uuid4().hex}.mp3"
+
     def upload_file(self, file_path: str, podcast_title: str, pdf_title: str) -> str:
         """
         Upload a file to S3 with organized folder structure
         Returns the S3 URL of the uploaded file
         """
         try:
-            # Sanitize the podcast and PDF titles
-            safe_podcast_title = self.sanitize_filename(podcast_title)
-            safe_pdf_title = self.sanitize_filename(pdf_title)
-            
-            # Create the S3 key with folder structure: podcast/{pdf_title}/{podcast_title}_{timestamp}.mp3
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            s3_key = f"podcast/{safe_pdf_title}/{safe_podcast_title}_{timestamp}.mp3"
+            s3_key = self.build_podcast_key(podcast_title, pdf_title)
             
             # Upload the file
             extra_args = {}
             extra_args['ContentType'] = 'audio/mpeg'
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key, ExtraArgs=extra_args)
+            self.s3_client.upload_file(
+                file_path,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
+            )
             
             # Generate the S3 URL
             url = f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
@@ -50,6 +66,28 @@ class S3Storage:
             print(f"Error uploading to S3: {str(e)}")
             raise
 
+    def upload_stream(self, fileobj, podcast_title: str, pdf_title: str) -> str:
+        """
+        Upload a readable stream to S3 as it is produced, in multipart parts
+        Returns the S3 URL of the uploaded file
+        """
+        try:
+            s3_key = self.build_podcast_key(podcast_title, pdf_title)
+            
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={'ContentType': 'audio/mpeg'},
+                Config=self.transfer_config
+            )
+            
+            return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
+            
+        except ClientError as e:
+            print(f"Error uploading to S3: {str(e)}")
+            raise
+
     def list_podcasts(self, pdf_title: str = None) -> list:
         """
         List all podcasts in the bucket, optionally filtered by PDF title
@@ -1,17 +1,29 @@
 import os
 from typing import Optional, Dict, Any
 from agents.utils.upstash_semantic_cache.semantic_cache import SemanticCache
-from datetime import datetime
-import json
+from datetime import datetime, timedelta
+from cachetools import TTLCache
+import threading
+import orjson
+
+# Marks keys known to be absent upstream, so repeated misses skip Upstash as well
+_CACHE_MISS = object()
+
+# RAG answers go stale once a document is re-indexed, so they are only reused for this long
+RAG_CACHE_TTL = timedelta(hours=1)
 
 class PodcastCache:
-    def __init__(self):
+    def __init__(self, namespace: str = ""):
         """Initialize the semantic cache for podcast queries"""
         self.cache = SemanticCache(
             url=os.getenv("UPSTASH_VECTOR_REST_URL"),
             token=os.getenv("UPSTASH_VECTOR_REST_TOKEN"),
-            min_proximity=0.97  # Adjust similarity threshold as needed
+            min_proximity=0.97,  # Adjust similarity threshold as needed
+            namespace=namespace
         )
+        # In-process layer in front of Upstash for repeated queries
+        self.local_cache = TTLCache(maxsize=512, ttl=300)
+        self.local_lock = threading.Lock()
 
     def generate_cache_key(self, query: str, pdf_title: str) -> str:
         """Generate a unique cache key for the query-document pair"""
@@ -24,17 +36,29 @@ class PodcastCache:
         """
         try:
             cache_key = self.generate_cache_key(query, pdf_title)
-            cached_data = self.cache.get(cache_key)
+            with self.local_lock:
+                local_data = self.local_cache.get(cache_key)
+            if local_data is _CACHE_MISS:
+                return None
+            if local_data is not None:
+                return local_data
             
-            if cached_data:
-                # Parse the cached string back into a dictionary
-                return json.loads(cached_data)
-            return None
+            result = self.fetch_entry(cache_key)
+            with self.local_lock:
+                self.local_cache[cache_key] = _CACHE_MISS if result is None else result
+            return result
             
         except Exception as e:
             print(f"Cache retrieval error: {str(e)}")
             return None
 
+    def fetch_entry(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Look up the closest stored entry for the key in Upstash"""
+        cached_data = self.cache.get(cache_key)
+        
+        # Parse the cached string back into a dictionary
+        return orjson.loads(cached_data) if cached_data else None
+
     def cache_podcast(self, query: str, pdf_title: str, podcast_data: Dict[str, Any]) -> bool:
         """
         Cache the podcast data for future retrieval
@@ -47,9 +71,11 @@ class PodcastCache:
             podcast_data['cached_at'] = datetime.now().isoformat()
             
             # Convert dictionary to string for caching
-            cache_value = json.dumps(podcast_data)
+            cache_value = orjson.dumps(podcast_data).decode()
             
             self.cache.set(cache_key, cache_value)
+            with self.local_lock:
+                self.local_cache[cache_key] = podcast_data
             return True
             
         except Exception as e:
@@ -60,8 +86,45 @@ class PodcastCache:
         """Clear all cached entries"""
         try:
             self.cache.flush()
+            with self.local_lock:
+                self.local_cache.clear()
             return True
         except Exception as e:
             print(f"Cache clear error: {str(e)}")
             return False
 
+class RAGCache(PodcastCache):
+    def __init__(self):
+        """Initialize the cache for RAG responses in its own namespace"""
+        super().__init__(namespace="rag")
+
+    def fetch_entry(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the entry stored under exactly this question and PDF title.
+        A similar question must not reuse another question's answer, and entries
+        older than RAG_CACHE_TTL are treated as missing.
+        """
+        cached_data = self.cache.get_exact(cache_key)
+        if not cached_data:
+            return None
+        
+        rag_response = orjson.loads(cached_data)
+        cached_at = rag_response.get('cached_at')
+        if not cached_at or datetime.now() - datetime.fromisoformat(cached_at) > RAG_CACHE_TTL:
+            return None
+        return rag_response
+
+    def get_cached_response(self, query: str, pdf_title: str) -> Optional[Dict[str, Any]]:
+        """
+        Try to retrieve a cached RAG response for the same query and PDF
+        Returns None if no fresh response is found
+        """
+        return self.get_cached_podcast(query, pdf_title)
+
+    def cache_response(self, query: str, pdf_title: str, rag_response: Dict[str, Any]) -> bool:
+        """
+        Cache a RAG response for future retrieval
+        Returns True if caching was successful
+        """
+        # Copy so the cached_at stamp does not leak into the caller's response
+        return self.cache_podcast(query, pdf_title, dict(rag_response))
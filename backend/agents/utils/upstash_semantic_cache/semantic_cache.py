@@ -47,6 +47,23 @@ class SemanticCache:
             return None
         return response.metadata["value"]
 
+    def get_exact(self, key: str) -> Optional[str]:
+        """
+        Fetches the value stored under exactly this key, without a similarity search.
+
+        Args:
+            key (str): The key to fetch from the cache.
+
+        Returns:
+            Optional[str]: The value stored under the key if it exists; otherwise, None.
+        """
+        response = self.index.fetch(
+            [self._hash_key(key)], include_metadata=True, namespace=self.namespace
+        )
+        if not response or response[0] is None or not response[0].metadata:
+            return None
+        return response[0].metadata["value"]
+
     def lookup(
         self, prompt: str, llm_string: Optional[str] = None
     ) -> Optional[List[Generation]]:
@@ -66,7 +66,7 @@ async def _async_generate_podcast(
         logger.debug(f"DEBUG File:{pdf_title}")
         logger.debug(f"DEBUG File:{file.id}")
 
-        result = podcast_generator.generate_content(
+        result = await podcast_generator.generate_content(
             question=query,
             pdf_title=pdf_title,
             output_type="podcast"
@@ -170,7 +170,7 @@ async def _async_generate_quiz(file_id: UUID, query: str, db: Session, user_id:
         logger.debug(f"DEBUG File:{pdf_title}")
         logger.debug(f"DEBUG File:{file.id}")
 
-        result = podcast_generator.generate_content(
+        result = await podcast_generator.generate_content(
             question=query,
             pdf_title=pdf_title,
             output_type="quiz"
@@ -245,7 +245,7 @@ async def _async_generate_flashcards(
         logger.debug(f"DEBUG File:{file.id}")
 
         try:
-            result = podcast_generator.generate_content(
+            result = await podcast_generator.generate_content(
                 question=query,
                 pdf_title=pdf_title,
                 output_type="flashcards"
@@ -409,6 +409,6 @@ async def generate_learning_materials(
             'operation': 'generate_learning_materials',
             'file_id': str(request.file_id),
             'user_id': str(current_user.id),
-            'request': request.dict()
+            'request': request.model_dump()
         })
         raise HTTPException(status_code=500, detail="Failed to start generation tasks")
\ No newline at end of file
@@ -82,7 +82,7 @@ async def generate_blog(
         print(f"DEBUG File:{pdf_title}")
         print(f"DEBUG File:{file.id}")
 
-        result = generator.generate_content(
+        result = await generator.generate_content(
             question=content_request.query,
             pdf_title=pdf_title,
             output_type="blog"
@@ -112,7 +112,7 @@ async def generate_tweet(
         pdf_title = file.filename.rsplit('.', 1)[0]
         print(f"DEBUG File:{pdf_title}")
         print(f"DEBUG File:{file.id}")
-        result = generator.generate_content(
+        result = await generator.generate_content(
             question=content_request.query,
             pdf_title=pdf_title,
             output_type="tweet"
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from agents.utils import podcast_audio
+from agents.utils.podcast_audio import AudioStreamAborted, stream_segments_to_upload
+
+SILENCE = b"|"
+
+@pytest.fixture(autouse=True)
+def passthrough_ffmpeg(monkeypatch):
+    """Replace the ffmpeg remux with cat so the uploaded bytes are exactly what was piped in"""
+    monkeypatch.setattr(podcast_audio, "FFMPEG_REMUX_COMMAND", ["cat"])
+
+def segment(chunks, delay=0.0, error=None):
+    """Fake ElevenLabs producer that streams the given chunks into its queue"""
+    async def produce(queue):
+        await asyncio.sleep(delay)
+        for chunk in chunks:
+            await queue.put(chunk)
+        await queue.put(error)
+    return produce
+
+class FakeUploader:
+    """Reads the stream like upload_fileobj does and records what it received"""
+
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.received = b""
+        self.completed = False
+
+    def __call__(self, audio_stream):
+        if self.fail_with:
+            raise self.fail_with
+        while chunk := audio_stream.read(8192):
+            self.received += chunk
+        self.completed = True
+        return "https://bucket.s3.amazonaws.com/podcast.mp3"
+
+@pytest.mark.asyncio
+async def test_output_keeps_script_order():
+    uploader = FakeUploader()
+    # Later segments finish first; the upload must still follow the script
+    producers = [
+        segment([b"a1", b"a2"], delay=0.05),
+        segment([b"b1"], delay=0.02),
+        segment([b"c1", b"c2"])
+    ]
+
+    url = await stream_segments_to_upload(producers, SILENCE, uploader)
+
+    assert url == "https://bucket.s3.amazonaws.com/podcast.mp3"
+    assert uploader.received == b"a1a2|b1|c1c2|"
+
+@pytest.mark.asyncio
+async def test_failed_segment_aborts_upload():
+    uploader = FakeUploader()
+    producers = [
+        segment([b"a1"]),
+        segment([b"b1"], error=ValueError("ElevenLabs API Error: 500"))
+    ]
+
+    with pytest.raises(ValueError, match="ElevenLabs API Error"):
+        await stream_segments_to_upload(producers, SILENCE, uploader)
+
+    assert not uploader.completed
+
+@pytest.mark.asyncio
+async def test_aborted_stream_fails_the_read():
+    reads = []
+
+    def upload(audio_stream):
+        try:
+            while audio_stream.read(8192):
+                pass
+        except AudioStreamAborted as e:
+            reads.append(e)
+            raise
+
+    with pytest.raises(ValueError):
+        await stream_segments_to_upload([segment([b"a1"], error=ValueError("boom"))], SILENCE, upload)
+
+    assert len(reads) == 1
+
+@pytest.mark.asyncio
+async def test_upload_failure_surfaces_s3_error():
+    uploader = FakeUploader(fail_with=RuntimeError("Unable to locate credentials"))
+    # Enough audio to overflow the pipe, so the closed read end breaks the pipeline
+    producers = [segment([b"x" * 256 * 1024] * 4) for _ in range(4)]
+
+    with pytest.raises(RuntimeError, match="Unable to locate credentials"):
+        await stream_segments_to_upload(producers, SILENCE, uploader)